@@ -1,44 +1,322 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, g, Response
 from pathlib import Path
+import json
+import os
+import threading
+import time
 import pandas as pd
-from datetime import datetime
-from search_voters import load_voters, create_dataframe
+from datetime import datetime, timezone
+from metrics import LatencyRegistry, SamplingProfiler, StageTimer, write_collapsed_stacks
 from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph
+from exports import render_xlsx, render_pdf
+from limits import AdmissionLimit, LazyExecutor, Overloaded, TimedOut, limited
+from http_cache import code_version, compress_response, conditional, dataset_version
+from shards import AGE_GROUP_LABELS, ShardStore, refresh_shards
+from voter_stream import iter_json_array
+from households import normalize_address
 
 app = Flask(__name__)
 
-# Load data at startup
+# Data is split into one shard per departamento/localidad (see shards.py).
+# Shards are loaded the first time a query needs them and the least recently
+# used ones are dropped when the loaded data goes over the memory budget.
 script_dir = Path(__file__).parent
 data_dir = script_dir / "data"
-voters = load_voters(data_dir / "all_voters.json")
-df = create_dataframe(voters)
+shard_dir = data_dir / "shards"
+SHARD_MEMORY_MB = float(os.environ.get('PADRON_SHARD_MEMORY_MB', 1024))
+
+# A padrón loaded the old way (pdf_info_extractor.py + merge_jsons.py) only
+# replaces all_voters.json, so rebuild any shards whose source file changed
+refresh_shards(shard_dir, data_dir / "all_voters.json")
+store = ShardStore(shard_dir, SHARD_MEMORY_MB * 1024 * 1024)
+
+# The data only changes when a new padrón is loaded, so everything derived
+# from it can be computed once and cached by clients against this version
+DATASET_VERSION = dataset_version(store.manifest_path)
+# Responses also change with the code and templates, so a deploy invalidates
+# what clients hold too
+CODE_FILES = [*script_dir.glob("*.py"), *(script_dir / "templates").glob("*.html")]
+CODE_VERSION = code_version(CODE_FILES)
+LAST_MODIFIED = datetime.fromtimestamp(
+    int(max(path.stat().st_mtime for path in [store.manifest_path, *CODE_FILES])), tz=timezone.utc)
+cached = conditional(f"{DATASET_VERSION}-{CODE_VERSION}", LAST_MODIFIED)
+
+# Get unique localities sorted alphabetically
+LOCALITIES = store.localities()
 
 # Calculate current year for age calculations
 CURRENT_YEAR = datetime.now().year
 
+# Fuzzy name search stops generating candidates after this many milliseconds
+FUZZY_BUDGET_MS = float(os.environ.get('PADRON_FUZZY_BUDGET_MS', 200))
+
+AGE_GROUP_DTYPE = pd.CategoricalDtype(AGE_GROUP_LABELS, ordered=True)
+
+# Columns of an empty result set
+RESULT_COLUMNS = ['dni', 'birth_year', 'name', 'address', 'doc_type', 'gender',
+                  'localidad_nombre', 'departamento_nombre', 'age_group']
+
+# Request instrumentation
+latency = LatencyRegistry()
+# Dump a flame graph for requests slower than this many milliseconds (0 disables profiling)
+PROFILE_SLOW_MS = float(os.environ.get('PADRON_PROFILE_SLOW_MS', 0))
+PROFILE_DIR = script_dir / "profiles"
+
+# Searches and exports get separate concurrency limits so slow exports never
+# hold the slots searches need. Export rendering runs in a bounded pool of
+# worker processes so it doesn't compete with searches for the GIL; filtering
+# an export needs the loaded shards, so it stays on the request thread.
+SEARCH_CONCURRENCY = int(os.environ.get('PADRON_SEARCH_CONCURRENCY', 8))
+SEARCH_WAIT_SECONDS = float(os.environ.get('PADRON_SEARCH_WAIT_SECONDS', 2))
+EXPORT_WORKERS = int(os.environ.get('PADRON_EXPORT_WORKERS', 2))
+EXPORT_QUEUE = int(os.environ.get('PADRON_EXPORT_QUEUE', 4))
+EXPORT_EXECUTOR = os.environ.get('PADRON_EXPORT_EXECUTOR', 'process')
+EXPORT_TIMEOUT_SECONDS = float(os.environ.get('PADRON_EXPORT_TIMEOUT_SECONDS', 300))
+
+search_limit = AdmissionLimit('search', SEARCH_CONCURRENCY, SEARCH_WAIT_SECONDS)
+export_limit = AdmissionLimit('export', EXPORT_WORKERS + EXPORT_QUEUE, 0)
+export_executor = LazyExecutor(EXPORT_WORKERS, EXPORT_EXECUTOR)
+
+def timed(stage):
+    """Time a block of the current request under the given stage name"""
+    return g.timer.stage(stage)
+
+def filter_label(args):
+    """Describe which filters a request uses, e.g. 'gender+name'"""
+    active = []
+    if args.get('localidad') not in (None, '', 'all'):
+        active.append('localidad')
+    if args.get('gender') not in (None, '', 'all'):
+        active.append('gender')
+    if args.get('address'):
+        active.append('address')
+    if args.get('name'):
+        active.append('fuzzy_name' if args.get('fuzzy') else 'name')
+    if args.get('age_from') or args.get('age_to'):
+        active.append('age')
+    return '+'.join(active) or 'none'
+
+@app.before_request
+def start_request_timer():
+    g.timer = StageTimer()
+    g.profiler = None
+    if PROFILE_SLOW_MS > 0 and request.endpoint not in (None, 'static', 'metrics'):
+        g.profiler = SamplingProfiler(threading.get_ident())
+        g.profiler.start()
+
+@app.after_request
+def record_request_timing(response):
+    timer = g.get('timer')
+    if timer is None or request.endpoint in (None, 'static', 'metrics'):
+        return response
+    
+    total = timer.elapsed()
+    route = request.endpoint
+    filters = filter_label(request.args)
+    for stage, seconds in timer.stages.items():
+        latency.observe(route, filters, stage, seconds)
+    latency.observe(route, filters, 'total', total)
+    response.headers['Server-Timing'] = timer.server_timing(total)
+    
+    profiler = g.get('profiler')
+    if profiler is not None:
+        stacks = profiler.stop()
+        if total * 1000 >= PROFILE_SLOW_MS:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            write_collapsed_stacks(stacks, PROFILE_DIR / f"{route}_{stamp}.folded")
+    
+    return response
+
+@app.after_request
+def compress(response):
+    # Registered after record_request_timing so it runs first and gets timed
+    if 'timer' not in g:
+        return compress_response(response)
+    with timed('compress'):
+        return compress_response(response)
+
+@app.teardown_request
+def stop_profiler(exc):
+    # Make sure the sampler thread ends even if the view raised
+    profiler = g.get('profiler')
+    if profiler is not None:
+        profiler.stop()
+
+@app.errorhandler(Overloaded)
+def handle_overloaded(error):
+    response = jsonify({'error': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+@app.errorhandler(TimedOut)
+def handle_timed_out(error):
+    response = jsonify({'error': str(error)})
+    response.status_code = 504
+    return response
+
+@app.route('/metrics')
+def metrics():
+    lines = [
+        '# HELP padron_in_flight_requests Requests currently holding a slot per pool.',
+        '# TYPE padron_in_flight_requests gauge',
+    ]
+    for limit in (search_limit, export_limit):
+        lines.append(f'padron_in_flight_requests{{pool="{limit.name}"}} {limit.in_flight}')
+    lines += [
+        '# TYPE padron_shards_loaded gauge',
+        f'padron_shards_loaded {len(store.loaded)}',
+        '# TYPE padron_shard_memory_bytes gauge',
+        f'padron_shard_memory_bytes {store.memory_bytes()}',
+        '# TYPE padron_shard_loads_total counter',
+        f'padron_shard_loads_total {store.loads}',
+        '# TYPE padron_shard_evictions_total counter',
+        f'padron_shard_evictions_total {store.evictions}',
+    ]
+    return Response(latency.render() + '\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+def parse_filters():
+    """Read the filter parameters shared by search and exports"""
+    address = request.args.get('address')
+    if address and not normalize_address(address):
+        # Only punctuation or markers like "N°" normalize to nothing; ignore the filter
+        address = None
+    return {
+        'padron': request.args.get('padron'),
+        'localidad': request.args.get('localidad'),
+        'gender': request.args.get('gender'),
+        'name': request.args.get('name'),
+        'fuzzy': request.args.get('fuzzy') == '1',
+        'address': address,
+        'age_from': request.args.get('age_from', type=int),
+        'age_to': request.args.get('age_to', type=int),
+    }
+
+def build_mask(shard, filters, fuzzy_budget):
+    """Build the boolean row mask of one shard for the given filters.
+
+    Also returns the fuzzy name scores indexed by row, or None when the
+    name is matched exactly.
+    """
+    df = shard.df
+    gender = filters['gender']
+    name = filters['name']
+    age_from = filters['age_from']
+    age_to = filters['age_to']
+    
+    # Start with all records
+    mask = pd.Series(True, index=df.index)
+    ranking = None
+    
+    # Apply filters (localidad is handled by picking the shards)
+    if gender and gender != 'all':
+        mask &= df['gender'] == gender
+    
+    if name and filters['fuzzy']:
+        rows, scores, truncated = shard.name_index().search(name, fuzzy_budget)
+        ranking = pd.Series(scores, index=rows)
+        ranking.attrs['truncated'] = truncated
+        mask &= df.index.isin(rows)
+    elif name:
+        mask &= df['name'].str.contains(name, case=False, na=False)
+    
+    if filters['address']:
+        mask &= df.index.isin(shard.households.matching_rows(filters['address']))
+    
+    if age_from is not None and age_to is not None:
+        birth_year_to = CURRENT_YEAR - age_from
+        birth_year_from = CURRENT_YEAR - age_to
+        mask &= (df['birth_year'] >= birth_year_from) & (df['birth_year'] <= birth_year_to)
+    
+    return mask, ranking
+
+def selected_shards(filters):
+    """Manifest entries of the shards a request has to look at"""
+    localidad = filters['localidad']
+    if localidad == 'all':
+        localidad = None
+    return store.select(localidad, filters['padron'])
+
+def query_voters(filters):
+    """Filter every shard the query touches and combine the matches.
+
+    Returns the matching rows, best fuzzy matches first and otherwise by
+    DNI, and whether the fuzzy search ran out of time (None for exact
+    name searches).
+    """
+    # One latency budget for the fuzzy search over all shards
+    fuzzy_budget = FUZZY_BUDGET_MS / 1000
+    parts = []
+    truncated = None
+    for entry in selected_shards(filters):
+        with timed('load'):
+            shard = store.get(entry)
+        if filters['fuzzy'] and filters['name']:
+            # Building a shard's name index doesn't count against the budget
+            with timed('index'):
+                shard.name_index()
+        with timed('mask'):
+            started = time.perf_counter()
+            mask, ranking = build_mask(shard, filters, fuzzy_budget)
+            fuzzy_budget = max(0.0, fuzzy_budget - (time.perf_counter() - started))
+        with timed('filter'):
+            part = shard.df[mask]
+            if ranking is not None:
+                part = part.assign(score=ranking.reindex(part.index))
+                truncated = bool(truncated) or ranking.attrs['truncated']
+            parts.append(part)
+    
+    with timed('filter'):
+        if not parts:
+            return pd.DataFrame(columns=RESULT_COLUMNS), truncated
+        results = pd.concat(parts, ignore_index=True)
+        if truncated is not None:
+            results = results.sort_values(['score', 'dni'], ascending=[False, True], kind='stable')
+        else:
+            results = results.sort_values('dni', kind='stable')
+    return results, truncated
+
+def facet_counts(results):
+    """Count the matches per localidad, gender and age group"""
+    return {
+        'localidad': {str(k): int(v) for k, v in results['localidad_nombre'].value_counts().items()},
+        'gender': {str(k): int(v) for k, v in results['gender'].value_counts().items()},
+        # Categorical counts keep the age groups in order, including empty ones
+        'age_group': {str(k): int(v) for k, v in
+                      results['age_group'].astype(AGE_GROUP_DTYPE).value_counts(sort=False).items()},
+    }
+
+def format_voters(rows):
+    """Format voter rows for display"""
+    formatted = []
+    for _, row in rows.iterrows():
+        age = CURRENT_YEAR - row['birth_year']
+        formatted.append({
+            'name': str(row['name']),  # Ensure string type
+            'dni': str(row['dni']),    # Ensure string type
+            'age': int(age),
+            'gender': 'Femenino' if row['gender'] == 'F' else 'Masculino',
+            'localidad': str(row['localidad_nombre']),
+            'address': str(row['address'])
+        })
+    return formatted
+
 @app.route('/')
+@cached
 def index():
-    # Get unique localities sorted alphabetically
-    localities = sorted(df['localidad_nombre'].unique())
-    return render_template('index.html', localities=localities)
+    return render_template('index.html', localities=LOCALITIES, padrones=store.padrones())
 
 @app.route('/search')
+@cached
+@limited(search_limit)
 def search():
     # Get search parameters
-    localidad = request.args.get('localidad')
-    gender = request.args.get('gender')
-    name = request.args.get('name')
-    age_from = request.args.get('age_from', type=int)
-    age_to = request.args.get('age_to', type=int)
+    filters = parse_filters()
     page = request.args.get('page', 1, type=int)
     
     # If no parameters are provided, return empty results
-    if not any([localidad, gender != 'all', name, age_from, age_to]):
+    if not any([filters['localidad'], filters['gender'] != 'all', filters['name'],
+                filters['address'], filters['age_from'], filters['age_to']]):
         return jsonify({
             'results': [],
             'total_results': 0,
@@ -46,26 +324,8 @@ def search():
             'current_page': 1
         })
     
-    # Start with all records
-    mask = pd.Series(True, index=df.index)
-    
-    # Apply filters
-    if localidad and localidad != 'all':
-        mask &= df['localidad_nombre'] == localidad
-    
-    if gender and gender != 'all':
-        mask &= df['gender'] == gender
-    
-    if name:
-        mask &= df['name'].str.contains(name, case=False, na=False)
-    
-    if age_from is not None and age_to is not None:
-        birth_year_to = CURRENT_YEAR - age_from
-        birth_year_from = CURRENT_YEAR - age_to
-        mask &= (df['birth_year'] >= birth_year_from) & (df['birth_year'] <= birth_year_to)
-    
     # Get filtered results
-    results = df[mask].copy()  # Create a copy to avoid SettingWithCopyWarning
+    results, truncated = query_voters(filters)
     
     # Calculate pagination
     per_page = 20
@@ -78,61 +338,187 @@ def search():
     paginated_results = results.iloc[start_idx:end_idx]
     
     # Format results for display
-    formatted_results = []
-    for _, row in paginated_results.iterrows():
-        age = CURRENT_YEAR - row['birth_year']
-        formatted_results.append({
-            'name': str(row['name']),  # Ensure string type
-            'dni': str(row['dni']),    # Ensure string type
-            'age': int(age),
-            'gender': 'Femenino' if row['gender'] == 'F' else 'Masculino',
-            'localidad': str(row['localidad_nombre']),
-            'address': str(row['address'])
-        })
+    with timed('format'):
+        formatted_results = format_voters(paginated_results)
     
-    response = {
+    data = {
         'results': formatted_results,
         'total_results': total_results,
         'total_pages': total_pages,
         'current_page': page
     }
-    
-    return jsonify(response)
+    if truncated is not None:
+        # Tell the client when the fuzzy search ran out of time budget
+        data['fuzzy_truncated'] = truncated
+    if request.args.get('facets') == '1':
+        with timed('facets'):
+            data['facets'] = facet_counts(results)
+    
+    with timed('json'):
+        response = jsonify(data)
+    if truncated:
+        # A truncated result depends on timing; don't let clients revalidate it
+        response.cache_control.no_store = True
+    return response
 
-def get_filtered_results():
-    """Get filtered results based on search parameters"""
+@app.route('/household')
+@cached
+@limited(search_limit)
+def household():
+    """List the voters at one address, or the addresses with at least N voters"""
     localidad = request.args.get('localidad')
-    gender = request.args.get('gender')
-    name = request.args.get('name')
-    age_from = request.args.get('age_from', type=int)
-    age_to = request.args.get('age_to', type=int)
+    if localidad == 'all':
+        localidad = None
+    address = request.args.get('address')
+    entries = store.select(localidad, request.args.get('padron'))
+    
+    if address:
+        parts = []
+        for entry in entries:
+            with timed('load'):
+                shard = store.get(entry)
+            with timed('lookup'):
+                parts.append(shard.df.loc[shard.households.lookup(address, localidad)])
+        with timed('format'):
+            voters = format_voters(pd.concat(parts)) if parts else []
+        with timed('json'):
+            return jsonify({'address': address, 'total_results': len(voters), 'results': voters})
+    
+    min_voters = request.args.get('min_voters', 2, type=int)
+    page = request.args.get('page', 1, type=int)
+    parts = []
+    size_counts = {}
+    for entry in entries:
+        with timed('load'):
+            shard = store.get(entry)
+        with timed('lookup'):
+            parts.append(shard.households.find(localidad, min_voters))
+            # Several padrones can have the same localidad
+            for name, counts in shard.households.size_counts.items():
+                merged = size_counts.setdefault(name, {})
+                for size, count in counts.items():
+                    merged[size] = merged.get(size, 0) + count
+    
+    with timed('lookup'):
+        if parts:
+            found = pd.concat(parts, ignore_index=True).sort_values(
+                ['voters', 'localidad', 'address'], ascending=[False, True, True], ignore_index=True)
+        else:
+            found = pd.DataFrame(columns=['localidad', 'address', 'voters'])
     
-    # Start with all records
-    mask = pd.Series(True, index=df.index)
+    # Calculate pagination
+    per_page = 50
+    total_results = len(found)
+    total_pages = max(1, (total_results + per_page - 1) // per_page)
+    start_idx = (page - 1) * per_page
     
-    # Apply filters
-    if localidad and localidad != 'all':
-        mask &= df['localidad_nombre'] == localidad
+    response = {
+        'results': found.iloc[start_idx:start_idx + per_page].to_dict('records'),
+        'total_results': total_results,
+        'total_pages': total_pages,
+        'current_page': page,
+        'size_counts': size_counts.get(localidad, {}) if localidad else size_counts
+    }
+    with timed('json'):
+        return jsonify(response)
+
+# Change sets between padrón editions written by `padron.py diff`
+changes_dir = data_dir / "changes"
+CHANGE_TYPES = ('added', 'removed', 'changed')
+changes_cache = {}
+changes_lock = threading.Lock()
+
+def flatten_change(change, record):
+    """One table row for a change record"""
+    if change == 'changed':
+        old, new = record['old'], record['new']
+        return {
+            'dni': record['dni'],
+            'name': record['name'],
+            'localidad': new['localidad']['nombre'],
+            'old_localidad': old['localidad']['nombre'],
+            'old_address': old['address'],
+            'new_localidad': new['localidad']['nombre'],
+            'new_address': new['address'],
+            'changes': ', '.join(record['changes']),
+        }
+    side = 'new' if change == 'added' else 'old'
+    return {
+        'dni': record['dni'],
+        'name': record['name'],
+        'localidad': record['localidad']['nombre'],
+        f'{side}_localidad': record['localidad']['nombre'],
+        f'{side}_address': record['address'],
+        'changes': change,
+    }
+
+def load_changes(change):
+    """Return the summary and one change set, reloading them when a new diff is written"""
+    summary_path = changes_dir / "summary.json"
+    if not summary_path.exists():
+        return None, None
+    version = summary_path.stat().st_mtime_ns
+    with changes_lock:
+        if changes_cache.get('version') != version:
+            changes_cache.clear()
+            changes_cache['version'] = version
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                changes_cache['summary'] = json.load(f)
+        if change not in changes_cache:
+            rows = (flatten_change(change, r) for r in iter_json_array(changes_dir / f"{change}.json"))
+            changes_cache[change] = pd.DataFrame(rows, columns=[
+                'dni', 'name', 'localidad', 'old_localidad', 'old_address',
+                'new_localidad', 'new_address', 'changes'
+            ]).fillna('')
+        return changes_cache['summary'], changes_cache[change]
+
+@app.route('/changes')
+def changes():
+    summary, _ = load_changes('added')
+    return render_template('changes.html', summary=summary)
+
+@app.route('/changes/data')
+@limited(search_limit)
+def changes_data():
+    change = request.args.get('type', 'added')
+    if change not in CHANGE_TYPES:
+        return jsonify({'error': f'Unknown change type {change}'}), 400
+    localidad = request.args.get('localidad')
+    page = request.args.get('page', 1, type=int)
     
-    if gender and gender != 'all':
-        mask &= df['gender'] == gender
+    with timed('load'):
+        summary, rows = load_changes(change)
+    if summary is None:
+        return jsonify({'error': 'No changes have been computed yet'}), 404
     
-    if name:
-        mask &= df['name'].str.contains(name, case=False, na=False)
+    with timed('filter'):
+        if localidad and localidad != 'all':
+            rows = rows[rows['localidad'] == localidad]
     
-    if age_from is not None and age_to is not None:
-        birth_year_to = CURRENT_YEAR - age_from
-        birth_year_from = CURRENT_YEAR - age_to
-        mask &= (df['birth_year'] >= birth_year_from) & (df['birth_year'] <= birth_year_to)
+    # Calculate pagination
+    per_page = 50
+    total_results = len(rows)
+    total_pages = max(1, (total_results + per_page - 1) // per_page)
+    start_idx = (page - 1) * per_page
     
-    return df[mask].copy()
+    response = {
+        'results': rows.iloc[start_idx:start_idx + per_page].to_dict('records'),
+        'total_results': total_results,
+        'total_pages': total_pages,
+        'current_page': page,
+        'totals': summary['totals'],
+    }
+    with timed('json'):
+        return jsonify(response)
 
-@app.route('/export/xlsx')
-def export_xlsx():
-    results = get_filtered_results()
-    
-    # Format results for export
-    export_df = pd.DataFrame({
+def get_filtered_results():
+    """Get filtered results based on search parameters"""
+    results, _ = query_voters(parse_filters())
+    return results
+
+def build_export_frame(results):
+    """Format results for export"""
+    return pd.DataFrame({
         'Nombre': results['name'],
         'DNI': results['dni'],
         'Edad': CURRENT_YEAR - results['birth_year'],
@@ -140,22 +526,28 @@ def export_xlsx():
         'Dirección': results['address'],
         'Localidad': results['localidad_nombre']
     })
+
+def render_export(render, export_df):
+    """Render an export in the export pool and wait for the file"""
+    with timed('render'):
+        future = export_executor.submit(render, export_df)
+        try:
+            return future.result(timeout=EXPORT_TIMEOUT_SECONDS)
+        except TimeoutError:
+            # A render that already started can't be stopped; it keeps its
+            # export slot until it ends so the pool can't pile up
+            if not future.cancel():
+                export_limit.release_after(future)
+            raise TimedOut('export', EXPORT_TIMEOUT_SECONDS) from None
+
+@app.route('/export/xlsx')
+@limited(export_limit)
+def export_xlsx():
+    results = get_filtered_results()
+    export_df = build_export_frame(results)
     
     # Create Excel file in memory
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        export_df.to_excel(writer, index=False, sheet_name='Resultados')
-        # Auto-adjust columns' width
-        worksheet = writer.sheets['Resultados']
-        for idx, col in enumerate(export_df.columns):
-            series = export_df[col]
-            max_len = max(
-                series.astype(str).map(len).max(),
-                len(str(col))
-            ) + 1
-            worksheet.set_column(idx, idx, max_len)
-    
-    output.seek(0)
+    output = BytesIO(render_export(render_xlsx, export_df))
     return send_file(
         output,
         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
@@ -164,74 +556,13 @@ def export_xlsx():
     )
 
 @app.route('/export/pdf')
+@limited(export_limit)
 def export_pdf():
     results = get_filtered_results()
+    export_df = build_export_frame(results)
     
-    # Format results for export
-    export_df = pd.DataFrame({
-        'Nombre': results['name'],
-        'DNI': results['dni'],
-        'Edad': CURRENT_YEAR - results['birth_year'],
-        'Género': results['gender'].map({'F': 'F', 'M': 'M'}),
-        'Dirección': results['address'],
-        'Localidad': results['localidad_nombre']
-    })
-    
-    # Create PDF buffer
-    buffer = BytesIO()
-    
-    # Create the PDF document
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=landscape(A4),
-        rightMargin=30,
-        leftMargin=30,
-        topMargin=30,
-        bottomMargin=30
-    )
-    
-    # Get styles
-    styles = getSampleStyleSheet()
-    
-    # Create the table data
-    data = [export_df.columns.tolist()] + export_df.values.tolist()
-    
-    # Create table
-    table = Table(data)
-    
-    # Add style to table
-    style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 12),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-    ])
-    table.setStyle(style)
-    
-    # Create the PDF
-    elements = []
-    
-    # Add title
-    title = Paragraph("Resultados de búsqueda", styles['Heading1'])
-    elements.append(title)
-    elements.append(table)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Reset buffer position
-    buffer.seek(0)
-    
+    # Create PDF file in memory
+    buffer = BytesIO(render_export(render_pdf, export_df))
     return send_file(
         buffer,
         mimetype='application/pdf',
@@ -0,0 +1,184 @@
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+from pdf_info_extractor import count_pages, iter_page_texts, parse_page_text
+
+# Benchmark and golden checks for the page parser.
+#
+#   python bench_parser.py --record padron.pdf --pages 50   record page texts
+#   python bench_parser.py --update-golden                  store the expected output
+#   python bench_parser.py                                  check and time the parsers
+#
+# Every page text is parsed by the current parser and by the previous one kept
+# below; both must agree and match the golden output stored next to the text.
+# tests/fixtures/page_texts holds a small synthetic set that the tests check.
+
+def legacy_extract_location_info(text):
+    dept_match = re.search(r'(\d+)-([^0-9\n]+)', text)
+    loc_match = re.search(r'(\d{4})-([^0-9\n]+)', text)
+
+    return {
+        "departamento": {
+            "codigo": dept_match.group(1) if dept_match else None,
+            "nombre": dept_match.group(2).strip() if dept_match else None
+        },
+        "localidad": {
+            "codigo": loc_match.group(1) if loc_match else None,
+            "nombre": loc_match.group(2).strip() if loc_match else None
+        }
+    }
+
+def legacy_parse_voter_line(line, location_info):
+    pattern = r'^\d+\s+(\d{8})\s+(\d{4})\s+([^,]+),([^,]+),\s*([^\s]+)\s+([MF])'
+    match = re.match(pattern, line.strip())
+    if match:
+        return {
+            "departamento": location_info["departamento"],
+            "localidad": location_info["localidad"],
+            "dni": match.group(1),
+            "birth_year": int(match.group(2)),
+            "name": match.group(3).strip(),
+            "address": match.group(4).strip(),
+            "doc_type": match.group(5).strip(),
+            "gender": match.group(6)
+        }
+    return None
+
+def legacy_parse_page_text(text):
+    """The line-by-line parser parse_page_text replaced, kept as the baseline"""
+    location_info = legacy_extract_location_info(text)
+    lines = text.split('\n')
+
+    start_idx = 0
+    for i, line in enumerate(lines):
+        if 'CLASEAPELLIDO' in line or 'DOCUMENTO GEN' in line:
+            start_idx = i + 1
+            break
+
+    voters = []
+    unmatched = []
+    for line in lines[start_idx:]:
+        if re.match(r'^\d+\s+\d{8}', line):
+            voter_data = legacy_parse_voter_line(line, location_info)
+            if voter_data:
+                voters.append(voter_data)
+            else:
+                unmatched.append(line)
+    return voters, unmatched
+
+def synthetic_page(rng, page_num, voters_per_page=40):
+    """A page laid out like the padrón, with a few lines that don't parse"""
+    lines = [
+        "PADRON ELECTORAL PROVISORIO",
+        f"Departamento: {page_num % 19 + 1:02d}-CASTELLANOS",
+        f"Localidad: {page_num % 7 + 1:04d}-RAFAELA",
+        "Nro DNI CLASEAPELLIDO Y NOMBRE,DOMICILIO TIPO DOCUMENTO GEN",
+    ]
+    for i in range(voters_per_page):
+        dni = rng.randrange(10_000_000, 99_999_999)
+        year = rng.randrange(1930, 2008)
+        line = (f"{page_num * voters_per_page + i + 1} {dni} {year} "
+                f"PEREZ JUAN {rng.choice('ABCDEFGH')},SAN MARTIN {rng.randrange(1, 3000)}, "
+                f"DNI-EA {rng.choice('MF')}")
+        if rng.random() < 0.02:
+            # Broken line, e.g. an address split across two lines
+            line = line.split(",")[0]
+        lines.append(line)
+    lines.append(f"Página {page_num}")
+    return "\n".join(lines)
+
+def record_pages(pdf_path, texts_dir, last_page):
+    texts_dir.mkdir(parents=True, exist_ok=True)
+    total_pages = count_pages(pdf_path)
+    last_page = min(last_page or total_pages, total_pages)
+    recorded = 0
+    for number, text, _, error in iter_page_texts(pdf_path, 1, last_page):
+        if error:
+            print(f"Skipping page {number}: {error}")
+            continue
+        (texts_dir / f"page_{number:06d}.txt").write_text(text, encoding="utf-8")
+        recorded += 1
+    print(f"Recorded {recorded} page texts to {texts_dir}")
+
+def load_pages(texts_dir, synthetic_pages):
+    paths = sorted(texts_dir.glob("*.txt")) if texts_dir.exists() else []
+    if paths:
+        return [(path, path.read_text(encoding="utf-8")) for path in paths]
+    print(f"No page texts in {texts_dir}, using {synthetic_pages} synthetic pages")
+    rng = random.Random(0)
+    return [(None, synthetic_page(rng, page_num)) for page_num in range(1, synthetic_pages + 1)]
+
+def check_pages(pages, update_golden):
+    """Compare both parsers, and the golden output, on every page; returns the failures"""
+    failures = 0
+    for path, text in pages:
+        name = path.name if path else "synthetic page"
+        result = parse_page_text(text)
+        expected = legacy_parse_page_text(text)
+        if list(result) != list(expected):
+            print(f"MISMATCH with the legacy parser: {name}")
+            failures += 1
+        if path is None:
+            continue
+        golden_path = path.with_suffix(".json")
+        output = {"voters": result[0], "unmatched_lines": result[1]}
+        if update_golden:
+            with open(golden_path, "w", encoding="utf-8") as f:
+                json.dump(output, f, ensure_ascii=False, indent=2)
+        elif not golden_path.exists():
+            print(f"No golden output for {path.name}; run with --update-golden to store it")
+            failures += 1
+        else:
+            with open(golden_path, "r", encoding="utf-8") as f:
+                if json.load(f) != output:
+                    print(f"MISMATCH with the golden output: {golden_path.name}")
+                    failures += 1
+    return failures
+
+def time_parser(parse, texts, repeat):
+    """Best of `repeat` runs over all the texts, in seconds"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            parse(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and benchmark the padrón page parser')
+    parser.add_argument('--texts-dir', default=str(Path(__file__).parent / "data" / "page_texts"),
+                        help='Directory with recorded page texts (default: data/page_texts)')
+    parser.add_argument('--record', metavar='PDF', help='Record the page texts of this PDF first')
+    parser.add_argument('--pages', type=int, help='Only record the first N pages')
+    parser.add_argument('--update-golden', action='store_true',
+                        help='Store the current parser output as the golden output')
+    parser.add_argument('--synthetic-pages', type=int, default=500,
+                        help='Synthetic pages to use when there are no recorded texts (default: 500)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs per parser (default: 5)')
+    args = parser.parse_args()
+
+    texts_dir = Path(args.texts_dir)
+    if args.record:
+        record_pages(args.record, texts_dir, args.pages)
+
+    pages = load_pages(texts_dir, args.synthetic_pages)
+    failures = check_pages(pages, args.update_golden)
+    if failures:
+        raise SystemExit(f"{failures} pages differ")
+    print(f"Checked {len(pages)} pages: output matches")
+
+    texts = [text for _, text in pages]
+    lines = sum(text.count('\n') + 1 for text in texts)
+    before = time_parser(legacy_parse_page_text, texts, args.repeat)
+    after = time_parser(parse_page_text, texts, args.repeat)
+    print(f"Lines: {lines}")
+    print(f"Before: {lines / before:,.0f} lines/s")
+    print(f"After:  {lines / after:,.0f} lines/s ({before / after:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from io import BytesIO
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+# These functions only take the export DataFrame so they can run in a
+# worker process without loading the voter data there.
+
+def render_xlsx(export_df):
+    """Render the export table as an Excel file and return its bytes"""
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        export_df.to_excel(writer, index=False, sheet_name='Resultados')
+        # Auto-adjust columns' width
+        worksheet = writer.sheets['Resultados']
+        for idx, col in enumerate(export_df.columns):
+            series = export_df[col]
+            max_len = max(
+                series.astype(str).map(len).max(),
+                len(str(col))
+            ) + 1
+            worksheet.set_column(idx, idx, max_len)
+
+    return output.getvalue()
+
+def render_pdf(export_df):
+    """Render the export table as a PDF file and return its bytes"""
+    # Create PDF buffer
+    buffer = BytesIO()
+
+    # Create the PDF document
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(A4),
+        rightMargin=30,
+        leftMargin=30,
+        topMargin=30,
+        bottomMargin=30
+    )
+
+    # Get styles
+    styles = getSampleStyleSheet()
+
+    # Create the table data
+    data = [export_df.columns.tolist()] + export_df.values.tolist()
+
+    # Create table
+    table = Table(data)
+
+    # Add style to table
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 14),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 12),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ])
+    table.setStyle(style)
+
+    # Create the PDF
+    elements = []
+
+    # Add title
+    title = Paragraph("Resultados de búsqueda", styles['Heading1'])
+    elements.append(title)
+    elements.append(table)
+
+    # Build PDF
+    doc.build(elements)
+
+    return buffer.getvalue()
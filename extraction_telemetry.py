@@ -0,0 +1,105 @@
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# Pages whose modified z-score on processing time exceeds this are flagged
+OUTLIER_Z_SCORE = 3.5
+# How many unmatched lines to keep per page as examples in the report
+SAMPLE_LINES = 3
+
+
+def format_duration(seconds):
+    """Format seconds as HH:MM:SS"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class RunTelemetry:
+    """Per-page timings and counts for one extraction run"""
+
+    def __init__(self, total_pages, stream=sys.stdout):
+        self.total_pages = total_pages
+        self.stream = stream
+        self.pages = []
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+
+    def record_page(self, page, extract_seconds, parse_seconds, voters, unmatched_lines, error=None):
+        """Store the numbers for one page and refresh the progress line"""
+        self.pages.append({
+            "page": page,
+            "extract_seconds": round(extract_seconds, 4),
+            "parse_seconds": round(parse_seconds, 4),
+            "voters": voters,
+            "unmatched_lines": len(unmatched_lines),
+            "unmatched_samples": unmatched_lines[:SAMPLE_LINES],
+            "error": error,
+        })
+        self.print_progress(page)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def pages_per_second(self):
+        elapsed = self.elapsed()
+        return len(self.pages) / elapsed if elapsed > 0 else 0.0
+
+    def print_progress(self, page):
+        done = len(self.pages)
+        rate = self.pages_per_second()
+        eta = (self.total_pages - done) / rate if rate > 0 else 0
+        pct = done / self.total_pages * 100 if self.total_pages else 100
+        line = (f"[{done:>{len(str(self.total_pages))}}/{self.total_pages}] {pct:5.1f}%  "
+                f"{rate:6.2f} pages/s  ETA {format_duration(eta)}  {page}")
+        self.stream.write(f"\r{line:<80}")
+        if done == self.total_pages:
+            self.stream.write("\n")
+        self.stream.flush()
+
+    def find_outliers(self):
+        """Flag slow pages, failed pages and pages with unparsed voter lines"""
+        times = [p["extract_seconds"] + p["parse_seconds"] for p in self.pages]
+        voter_counts = [p["voters"] for p in self.pages if not p["error"]]
+        median_time = statistics.median(times) if times else 0
+        mad = statistics.median(abs(t - median_time) for t in times) if times else 0
+        median_voters = statistics.median(voter_counts) if voter_counts else 0
+
+        outliers = []
+        for page, page_time in zip(self.pages, times):
+            reasons = []
+            if page["error"]:
+                reasons.append("error")
+            if mad > 0 and 0.6745 * (page_time - median_time) / mad > OUTLIER_Z_SCORE:
+                reasons.append("slow")
+            if page["unmatched_lines"]:
+                reasons.append("unmatched_lines")
+            if not page["error"] and page["voters"] < median_voters / 2:
+                reasons.append("few_voters")
+            if reasons:
+                outliers.append({"page": page["page"], "seconds": round(page_time, 4), "reasons": reasons})
+        return outliers
+
+    def report(self):
+        elapsed = self.elapsed()
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "elapsed_seconds": round(elapsed, 2),
+            "pages": len(self.pages),
+            "failed_pages": sum(1 for p in self.pages if p["error"]),
+            "voters": sum(p["voters"] for p in self.pages),
+            "unmatched_lines": sum(p["unmatched_lines"] for p in self.pages),
+            "pages_per_second": round(self.pages_per_second(), 3),
+            "extract_seconds": round(sum(p["extract_seconds"] for p in self.pages), 2),
+            "parse_seconds": round(sum(p["parse_seconds"] for p in self.pages), 2),
+            "outliers": self.find_outliers(),
+            "per_page": self.pages,
+        }
+
+    def save_report(self, output_path):
+        """Save the run report as JSON"""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
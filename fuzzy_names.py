@@ -0,0 +1,198 @@
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+import numpy as np
+
+# Spelling rules applied in order to build the phonetic key of a token.
+# They fold letters that sound the same in Rioplatense Spanish.
+PHONETIC_RULES = [
+    (re.compile(r'CH'), '#'),
+    (re.compile(r'QU(?=[EI])'), 'K'),
+    (re.compile(r'GU(?=[EI])'), 'g'),
+    (re.compile(r'C(?=[EI])'), 'S'),
+    (re.compile(r'G(?=[EI])'), 'J'),
+    (re.compile(r'[CQ]'), 'K'),
+    (re.compile(r'Z'), 'S'),
+    (re.compile(r'X'), 'KS'),
+    (re.compile(r'LL'), 'Y'),
+    (re.compile(r'I(?=[AEOU])'), 'Y'),
+    (re.compile(r'[VW]'), 'B'),
+    (re.compile(r'H'), ''),
+    (re.compile(r'(.)\1+'), r'\1'),
+    # The lowercase placeholder keeps the hard G of GUE/GUI away from the G -> J rule
+    (re.compile(r'g'), 'G'),
+]
+
+NON_LETTERS = re.compile(r'[^A-Z]+')
+
+# Scores given to each kind of token match
+EXACT_SCORE = 1.0
+PHONETIC_SCORE = 0.9
+PREFIX_SCORE = 0.8
+MIN_EDIT_SCORE = 0.6
+
+# How often (in candidates) to check the latency budget
+BUDGET_CHECK_EVERY = 256
+
+
+def normalize_name(text):
+    """Uppercase, strip accents and collapse everything but letters into single spaces"""
+    decomposed = unicodedata.normalize('NFKD', str(text).upper())
+    letters = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_LETTERS.sub(' ', letters).strip()
+
+
+def phonetic_key(token):
+    """Spanish-aware phonetic key of a normalized token (GONZÁLES and GONZALEZ match)"""
+    for pattern, replacement in PHONETIC_RULES:
+        token = pattern.sub(replacement, token)
+    return token
+
+
+def trigrams(token):
+    padded = f"$${token}$$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(token):
+    """Edit distance allowed for a query token of this length"""
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 5:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a, b, limit):
+    """Edit distance between a and b, or limit + 1 if it is larger than limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class NameIndex:
+    """Token, phonetic and trigram indexes over the voter names of a DataFrame"""
+
+    def __init__(self, names):
+        token_ids = {}
+        token_rows = []
+        for row, name in zip(names.index, names):
+            for token in set(normalize_name(name).split()):
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = token_ids[token] = len(token_rows)
+                    token_rows.append([])
+                token_rows[token_id].append(row)
+
+        self.tokens = list(token_ids)
+        self.token_ids = token_ids
+        self.token_rows = [np.array(rows) for rows in token_rows]
+        self.token_lengths = np.array([len(token) for token in self.tokens])
+        self.sorted_tokens = sorted(self.tokens)
+
+        phonetic = {}
+        grams = {}
+        for token_id, token in enumerate(self.tokens):
+            phonetic.setdefault(phonetic_key(token), []).append(token_id)
+            for gram in trigrams(token):
+                grams.setdefault(gram, []).append(token_id)
+        self.phonetic = phonetic
+        self.trigrams = {gram: np.array(ids) for gram, ids in grams.items()}
+
+    def match_token(self, query, deadline):
+        """Score the indexed tokens similar to one query token.
+
+        Returns a dict of token id to score and whether the budget ran out.
+        """
+        scores = {}
+        exact = self.token_ids.get(query)
+        if exact is not None:
+            scores[exact] = EXACT_SCORE
+        for token_id in self.phonetic.get(phonetic_key(query), ()):
+            scores.setdefault(token_id, PHONETIC_SCORE)
+
+        # Tokens the query is a prefix of, so partially typed names still match
+        start = bisect_left(self.sorted_tokens, query)
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(query):
+                break
+            scores.setdefault(self.token_ids[token], PREFIX_SCORE)
+
+        limit = max_edits(query)
+        if limit == 0:
+            return scores, False
+
+        # Tokens within `limit` edits share at least this many trigrams
+        query_grams = trigrams(query)
+        needed = len(query_grams) - 3 * limit
+        arrays = [self.trigrams[gram] for gram in query_grams if gram in self.trigrams]
+        if needed > 0 and arrays:
+            counts = np.bincount(np.concatenate(arrays), minlength=len(self.tokens))
+            candidates = np.nonzero(counts >= needed)[0]
+            candidates = candidates[np.argsort(-counts[candidates], kind='stable')]
+        else:
+            candidates = np.nonzero(np.abs(self.token_lengths - len(query)) <= limit)[0]
+
+        for checked, token_id in enumerate(candidates):
+            if checked % BUDGET_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                return scores, True
+            token_id = int(token_id)
+            if token_id in scores:
+                continue
+            token = self.tokens[token_id]
+            distance = bounded_levenshtein(query, token, limit)
+            if distance <= limit:
+                score = 1 - distance / max(len(query), len(token))
+                if score >= MIN_EDIT_SCORE:
+                    scores[token_id] = score
+        return scores, False
+
+    def search(self, query, budget_seconds):
+        """Rank rows whose name matches every token of the query.
+
+        Returns (rows, scores) sorted by descending score and a flag telling
+        whether candidate generation was cut short by the latency budget.
+        """
+        deadline = time.perf_counter() + budget_seconds
+        query_tokens = normalize_name(query).split()
+        if not query_tokens:
+            return np.array([], dtype=int), np.array([]), False
+
+        rows = None
+        totals = None
+        truncated = False
+        for query_token in query_tokens:
+            token_scores, cut = self.match_token(query_token, deadline)
+            truncated |= cut
+            if not token_scores:
+                return np.array([], dtype=int), np.array([]), truncated
+
+            # Best score per row for this query token
+            token_ids = list(token_scores)
+            row_arrays = [self.token_rows[t] for t in token_ids]
+            matched_rows = np.concatenate(row_arrays)
+            matched_scores = np.repeat([token_scores[t] for t in token_ids],
+                                       [len(a) for a in row_arrays])
+            order = np.lexsort((-matched_scores, matched_rows))
+            matched_rows, first = np.unique(matched_rows[order], return_index=True)
+            matched_scores = matched_scores[order][first]
+
+            if rows is None:
+                rows, totals = matched_rows, matched_scores
+            else:
+                rows, left, right = np.intersect1d(rows, matched_rows, assume_unique=True,
+                                                   return_indices=True)
+                totals = totals[left] + matched_scores[right]
+
+        scores = totals / len(query_tokens)
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order], truncated
@@ -0,0 +1,79 @@
+import re
+import unicodedata
+import pandas as pd
+
+# Common spellings of street-type words and markers mapped to one form
+ADDRESS_WORDS = {
+    'AV': 'AVENIDA', 'AVDA': 'AVENIDA', 'AVE': 'AVENIDA',
+    'BV': 'BOULEVARD', 'BVARD': 'BOULEVARD', 'BVRD': 'BOULEVARD', 'BULEVAR': 'BOULEVARD',
+    'PJE': 'PASAJE', 'PSJE': 'PASAJE',
+    'GRAL': 'GENERAL', 'DR': 'DOCTOR', 'PTE': 'PRESIDENTE',
+    'DPTO': 'DEPTO', 'DTO': 'DEPTO', 'DEPARTAMENTO': 'DEPTO',
+    'SN': 'S/N',
+}
+# Words dropped entirely, like the "N°" in "SAN MARTIN N° 123"
+DROPPED_WORDS = {'N', 'NO', 'NRO', 'NUM', 'NUMERO'}
+
+SEPARATORS = re.compile(r'[^A-Z0-9]+')
+
+
+def normalize_address(address):
+    """Uppercase, strip accents and punctuation and unify abbreviations"""
+    decomposed = unicodedata.normalize('NFKD', str(address).upper())
+    text = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    text = text.replace('S/N', ' SN ')
+    words = []
+    for word in SEPARATORS.sub(' ', text).split():
+        if word in DROPPED_WORDS:
+            continue
+        words.append(ADDRESS_WORDS.get(word, word))
+    return ' '.join(words)
+
+
+class HouseholdIndex:
+    """Voter rows grouped by localidad and normalized address"""
+
+    def __init__(self, df):
+        normalized = df['address'].map(normalize_address)
+        groups = df.groupby([df['localidad_nombre'], normalized], sort=True).indices
+        self.rows = {key: df.index[positions] for key, positions in groups.items()}
+
+        sizes = pd.DataFrame(
+            [(localidad, address, len(rows)) for (localidad, address), rows in self.rows.items()],
+            columns=['localidad', 'address', 'voters']
+        )
+        self.households = sizes.sort_values(['voters', 'localidad', 'address'],
+                                            ascending=[False, True, True], ignore_index=True)
+        self.addresses = self.households['address'].to_numpy()
+
+        # How many households of each size every localidad has
+        self.size_counts = {
+            localidad: {int(size): int(count) for size, count in group['voters'].value_counts().sort_index().items()}
+            for localidad, group in sizes.groupby('localidad')
+        }
+
+    def lookup(self, address, localidad=None):
+        """Rows registered at exactly this address"""
+        normalized = normalize_address(address)
+        if localidad:
+            return self.rows.get((localidad, normalized), pd.Index([]))
+        parts = [rows for (_, key), rows in self.rows.items() if key == normalized]
+        return parts[0].append(parts[1:]) if parts else pd.Index([])
+
+    def matching_rows(self, address):
+        """Rows whose normalized address contains the normalized query"""
+        normalized = normalize_address(address)
+        if not normalized:
+            return pd.Index([])
+        # Scanning the unique addresses is much cheaper than scanning every voter
+        hits = self.households[pd.Series(self.addresses).str.contains(normalized, regex=False).to_numpy()]
+        parts = [self.rows[key] for key in zip(hits['localidad'], hits['address'])]
+        return parts[0].append(parts[1:]) if parts else pd.Index([])
+
+    def find(self, localidad=None, min_voters=1):
+        """Households with at least `min_voters` voters, largest first"""
+        households = self.households
+        selected = households['voters'].to_numpy() >= min_voters
+        if localidad:
+            selected &= households['localidad'].to_numpy() == localidad
+        return households[selected]
@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+from functools import wraps
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 500
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain')
+
+
+def dataset_version(path):
+    """Identify a data file by its size and modification time"""
+    stat = path.stat()
+    return hashlib.sha1(f"{stat.st_size}-{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def code_version(paths):
+    """Identify the code and templates that shape the responses by their contents"""
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:8]
+
+
+def normalized_args(args):
+    """Drop empty and 'all' parameters and sort the rest so equivalent queries match"""
+    items = []
+    for key, value in args.items(multi=True):
+        value = value.strip()
+        if value in ('', 'all'):
+            continue
+        if key == 'name':
+            # Name search is case-insensitive
+            value = value.casefold()
+        items.append((key, value))
+    return sorted(items)
+
+
+def conditional(version, last_modified):
+    """Answer repeated requests with 304 while the dataset is unchanged.
+
+    The ETag is derived from the version, the route and the normalized
+    query parameters. Responses marked no-store by the view get no validator.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f"{request.path}?{normalized_args(request.args)}"
+            etag = f"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and since >= last_modified
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response):
+                    response = Response(response)
+                if response.status_code != 200 or response.cache_control.no_store:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            # Let clients keep responses but revalidate them every time
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def compress_response(response):
+    """Compress a response body with brotli or gzip when the client accepts it"""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
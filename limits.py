@@ -0,0 +1,96 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot get a slot in its pool in time"""
+
+    def __init__(self, pool):
+        super().__init__(f"Too many concurrent {pool} requests")
+        self.pool = pool
+
+
+class TimedOut(Exception):
+    """Raised when work handed to a pool doesn't finish in time"""
+
+    def __init__(self, pool, seconds):
+        super().__init__(f"The {pool} took longer than {seconds:g} seconds")
+        self.pool = pool
+
+
+class AdmissionLimit:
+    """Bound how many requests of one kind run at the same time"""
+
+    def __init__(self, name, limit, wait_seconds):
+        self.name = name
+        self.limit = limit
+        self.wait_seconds = wait_seconds
+        self.in_flight = 0
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def slot(self):
+        if not self._semaphore.acquire(timeout=self.wait_seconds):
+            raise Overloaded(self.name)
+        with self._lock:
+            self.in_flight += 1
+        self._local.future = None
+        try:
+            yield
+        finally:
+            future, self._local.future = self._local.future, None
+            if future is None:
+                self._release()
+            else:
+                future.add_done_callback(lambda _: self._release())
+
+    def release_after(self, future):
+        """Keep the slot held by this thread until `future` finishes, not until the request ends"""
+        self._local.future = future
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+
+def limited(admission):
+    """Decorate a view so it only runs while holding a slot of `admission`"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with admission.slot():
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def process_context():
+    # Forking a multi-threaded server can copy a lock some other thread holds
+    # and deadlock the child, so start workers from a clean process instead
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class LazyExecutor:
+    """Create a thread or process pool on first use"""
+
+    def __init__(self, max_workers, kind="process"):
+        self.max_workers = max_workers
+        self.kind = kind
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(self.max_workers, mp_context=process_context())
+                else:
+                    self._executor = ThreadPoolExecutor(self.max_workers)
+        return self._executor.submit(fn, *args)
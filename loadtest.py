@@ -0,0 +1,79 @@
+import argparse
+import random
+import statistics
+import threading
+import time
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+DEFAULT_NAMES = ['GONZALEZ', 'RODRIGUEZ', 'PEREZ', 'FERNANDEZ', 'LOPEZ', 'MARTINEZ', 'GOMEZ', 'DIAZ']
+
+def timed_get(url, timeout):
+    """GET a URL, read the whole body and return (status, seconds)"""
+    started = time.perf_counter()
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except HTTPError as e:
+        status = e.code
+    except URLError:
+        status = None
+    return status, time.perf_counter() - started
+
+def search_client(base_url, names, deadline, results, timeout):
+    while time.perf_counter() < deadline:
+        params = {'name': random.choice(names), 'page': random.randint(1, 3)}
+        results.append(timed_get(f"{base_url}/search?{urlencode(params)}", timeout))
+
+def export_client(base_url, names, deadline, results, timeout):
+    while time.perf_counter() < deadline:
+        kind = random.choice(['pdf', 'xlsx'])
+        params = {'name': random.choice(names)}
+        results.append(timed_get(f"{base_url}/export/{kind}?{urlencode(params)}", timeout))
+
+def summarize(label, results):
+    ok = sorted(seconds for status, seconds in results if status == 200)
+    rejected = sum(1 for status, _ in results if status == 503)
+    failed = len(results) - len(ok) - rejected
+    print(f"{label}: {len(results)} requests, {len(ok)} ok, {rejected} rejected (503), {failed} failed")
+    if ok:
+        quantiles = statistics.quantiles(ok, n=100) if len(ok) > 1 else [ok[0]] * 99
+        print(f"  p50 {quantiles[49] * 1000:.1f} ms  p95 {quantiles[94] * 1000:.1f} ms  "
+              f"p99 {quantiles[98] * 1000:.1f} ms  max {ok[-1] * 1000:.1f} ms")
+
+def run_load_test(base_url, searchers, exporters, duration, names, timeout):
+    """Run search and export clients against a running server and print latencies"""
+    deadline = time.perf_counter() + duration
+    search_results = []
+    export_results = []
+    threads = [
+        threading.Thread(target=search_client, args=(base_url, names, deadline, search_results, timeout))
+        for _ in range(searchers)
+    ] + [
+        threading.Thread(target=export_client, args=(base_url, names, deadline, export_results, timeout))
+        for _ in range(exporters)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"\n{searchers} search clients, {exporters} export clients, {duration}s against {base_url}")
+    summarize("Searches", search_results)
+    if exporters:
+        summarize("Exports", export_results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Mix search and export requests against a running server')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server')
+    parser.add_argument('--searchers', type=int, default=8, help='Concurrent search clients (default: 8)')
+    parser.add_argument('--exporters', type=int, default=4, help='Concurrent export clients (default: 4)')
+    parser.add_argument('--duration', type=float, default=30, help='Test duration in seconds (default: 30)')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-request timeout in seconds')
+    parser.add_argument('--names', nargs='+', default=DEFAULT_NAMES, help='Names to search for')
+
+    args = parser.parse_args()
+
+    run_load_test(args.url.rstrip('/'), args.searchers, args.exporters, args.duration, args.names, args.timeout)
@@ -0,0 +1,103 @@
+import argparse
+from pathlib import Path
+
+def run_build(args):
+    from pipeline import build
+    script_dir = Path(__file__).parent
+    data_dir = Path(args.data_dir) if args.data_dir else script_dir / "data"
+    analysis_dir = Path(args.analysis_dir) if args.analysis_dir else script_dir / "analysis"
+    build(
+        args.input_pdf,
+        data_dir,
+        analysis_dir,
+        args.padron,
+        split_dir=Path(args.split_pages) if args.split_pages else None,
+        page_json_dir=data_dir if args.page_json else None,
+        shards=not args.no_shards,
+        plots=args.plots,
+        workers=args.workers,
+    )
+
+def run_diff(args):
+    from padron_diff import diff_snapshots
+    output_dir = Path(args.output_dir) if args.output_dir else Path(__file__).parent / "data" / "changes"
+    try:
+        summary = diff_snapshots(Path(args.old_json), Path(args.new_json), output_dir)
+    except (OSError, ValueError) as e:
+        # Bad input; the previous change sets in output_dir are left as they were
+        raise SystemExit(f"Cannot compare the snapshots: {e}")
+    except KeyError as e:
+        raise SystemExit(f"Cannot compare the snapshots: a voter record has no {e} field")
+    totals = summary['totals']
+    print(f"Added: {totals['added']}, removed: {totals['removed']}, changed: {totals['changed']}")
+    duplicates = summary['duplicates']
+    if duplicates['old'] or duplicates['new']:
+        print(f"Warning: repeated DNIs in the previous edition: {duplicates['old']}, "
+              f"in the new one: {duplicates['new']}; only the first record of each was compared "
+              f"(see duplicates.json)")
+    print(f"Change sets saved to {output_dir}")
+
+def run_coordinate(args):
+    from work_queue import JOB_FILE, init_queue, run_coordinator
+    queue_dir = Path(args.queue_dir)
+    if not (queue_dir / JOB_FILE).exists():
+        if not args.input_pdf:
+            raise SystemExit(f"No queue in {queue_dir}; pass the padrón PDF to create one")
+        job = init_queue(queue_dir, args.input_pdf, args.batch_size, args.lease_seconds)
+        print(f"Queued {job['total_pages']} pages in batches of {args.batch_size}")
+    data_dir = Path(args.data_dir) if args.data_dir else Path(__file__).parent / "data"
+    run_coordinator(queue_dir, data_dir, args.padron, shards=not args.no_shards)
+
+def run_worker(args):
+    from work_queue import run_worker
+    run_worker(Path(args.queue_dir), args.pdf)
+
+def main():
+    parser = argparse.ArgumentParser(description='Padrón processing tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Extract, merge and analyze a padrón PDF in one pass')
+    build.add_argument('input_pdf', help='Path to the padrón PDF')
+    build.add_argument('--padron', default='padron',
+                       help='Name of the padrón for the shard manifest (default: padron)')
+    build.add_argument('--data-dir', help='Output directory for voter data (default: data)')
+    build.add_argument('--analysis-dir', help='Output directory for statistics (default: analysis)')
+    build.add_argument('--split-pages', metavar='DIR',
+                       help='Also write one PDF per page to this directory')
+    build.add_argument('--page-json', action='store_true',
+                       help='Also write page_<n>.json files to the data directory')
+    build.add_argument('--workers', type=int,
+                       help='Processes extracting page text (default: number of CPUs)')
+    build.add_argument('--plots', action='store_true', help='Also draw the distribution plots')
+    build.add_argument('--no-shards', action='store_true', help='Skip writing the per-localidad shards')
+    build.set_defaults(func=run_build)
+
+    diff = commands.add_parser('diff', help='List voters added, removed or moved between two editions')
+    diff.add_argument('old_json', help='Voters file of the previous edition, sorted by DNI')
+    diff.add_argument('new_json', help='Voters file of the new edition, sorted by DNI')
+    diff.add_argument('--output-dir', help='Output directory for the change sets (default: data/changes)')
+    diff.set_defaults(func=run_diff)
+
+    coordinate = commands.add_parser('coordinate',
+                                     help='Share extraction across machines through a queue directory')
+    coordinate.add_argument('input_pdf', nargs='?', help='Padrón PDF; needed when the queue is created')
+    coordinate.add_argument('--queue-dir', required=True, help='Queue directory shared by all machines')
+    coordinate.add_argument('--batch-size', type=int, default=50, help='Pages per batch (default: 50)')
+    coordinate.add_argument('--lease-seconds', type=int, default=300,
+                            help='Requeue a batch when its worker is silent this long (default: 300)')
+    coordinate.add_argument('--padron', default='padron',
+                            help='Name of the padrón for the shard manifest (default: padron)')
+    coordinate.add_argument('--data-dir', help='Output directory for voter data (default: data)')
+    coordinate.add_argument('--no-shards', action='store_true', help='Skip writing the per-localidad shards')
+    coordinate.set_defaults(func=run_coordinate)
+
+    worker = commands.add_parser('worker', help='Process batches from a shared queue directory')
+    worker.add_argument('--queue-dir', required=True, help='Queue directory shared by all machines')
+    worker.add_argument('--pdf', help='Local copy of the padrón PDF (default: the path in the queue)')
+    worker.set_defaults(func=run_worker)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
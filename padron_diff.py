@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from voter_stream import JsonArrayWriter, iter_json_array
+from households import normalize_address
+
+CHANGE_TYPES = ("added", "removed", "changed")
+
+
+def sorted_by_dni(voters, source, on_duplicate):
+    """Pass voters through, checking they come in DNI order.
+
+    merge_join needs every DNI once, so only the first record of a repeated
+    DNI is passed on and the others go to `on_duplicate`.
+    """
+    previous = None
+    for voter in voters:
+        if previous is not None and voter["dni"] < previous:
+            raise ValueError(f"{source} is not sorted by DNI ({voter['dni']} after {previous}); "
+                             "merge it with merge_jsons.py or padron.py build first")
+        if voter["dni"] == previous:
+            on_duplicate(voter)
+            continue
+        previous = voter["dni"]
+        yield voter
+
+
+def location(voter):
+    return {
+        "departamento": voter["departamento"],
+        "localidad": voter["localidad"],
+        "address": voter["address"],
+    }
+
+
+def compare(old, new):
+    """What changed between two records of the same voter"""
+    changes = []
+    if (old["localidad"]["codigo"], old["departamento"]["codigo"]) != \
+            (new["localidad"]["codigo"], new["departamento"]["codigo"]):
+        changes.append("localidad")
+    # Only count real moves, not spacing or abbreviation differences
+    if normalize_address(old["address"]) != normalize_address(new["address"]):
+        changes.append("address")
+    return changes
+
+
+def merge_join(old_voters, new_voters):
+    """Walk two DNI-sorted streams together and yield (change type, record)"""
+    missing = object()
+    old = next(old_voters, missing)
+    new = next(new_voters, missing)
+    while old is not missing or new is not missing:
+        if new is missing or (old is not missing and old["dni"] < new["dni"]):
+            yield "removed", old
+            old = next(old_voters, missing)
+        elif old is missing or new["dni"] < old["dni"]:
+            yield "added", new
+            new = next(new_voters, missing)
+        else:
+            changes = compare(old, new)
+            if changes:
+                yield "changed", {
+                    "dni": new["dni"],
+                    "name": new["name"],
+                    "changes": changes,
+                    "old": location(old),
+                    "new": location(new),
+                }
+            old = next(old_voters, missing)
+            new = next(new_voters, missing)
+
+
+def diff_snapshots(old_path, new_path, output_dir):
+    """Compare two DNI-sorted voter snapshots and write the change sets.
+
+    Both files are streamed, so memory use doesn't grow with their size.
+    Writes added.json, removed.json, changed.json, duplicates.json (records
+    whose DNI already appeared in the same snapshot) and summary.json. They
+    are written to a temporary directory and only moved into `output_dir`
+    once the whole diff succeeded, summary.json last.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix=".diff-", dir=output_dir))
+    try:
+        summary = write_diff(old_path, new_path, work_dir)
+        for name in [f"{change}.json" for change in CHANGE_TYPES] + ["duplicates.json", "summary.json"]:
+            os.replace(work_dir / name, output_dir / name)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return summary
+
+
+def write_diff(old_path, new_path, output_dir):
+    writers = {change: JsonArrayWriter(output_dir / f"{change}.json") for change in CHANGE_TYPES}
+    writers["duplicates"] = JsonArrayWriter(output_dir / "duplicates.json")
+    duplicates = Counter()
+
+    def set_aside(edition, voter):
+        writers["duplicates"].write({"edition": edition, **voter})
+        duplicates[edition] += 1
+
+    by_localidad = {}
+    try:
+        old_voters = sorted_by_dni(iter_json_array(old_path), old_path, partial(set_aside, "old"))
+        new_voters = sorted_by_dni(iter_json_array(new_path), new_path, partial(set_aside, "new"))
+        for change, record in merge_join(old_voters, new_voters):
+            writers[change].write(record)
+            localidad = (record["new"] if change == "changed" else record)["localidad"]["nombre"]
+            counts = by_localidad.setdefault(localidad, dict.fromkeys(CHANGE_TYPES, 0))
+            counts[change] += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    summary = {
+        "old": str(old_path),
+        "new": str(new_path),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "totals": {change: writers[change].count for change in CHANGE_TYPES},
+        "duplicates": {"old": duplicates["old"], "new": duplicates["new"]},
+        "by_localidad": dict(sorted(by_localidad.items())),
+    }
+    with open(output_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
@@ -1,22 +1,45 @@
 import pdfplumber
 import json
 import re
+import time
 from pathlib import Path
+from extraction_telemetry import RunTelemetry
+
+# Patterns are compiled once here instead of going through the re cache on
+# every call
+DEPARTAMENTO_PATTERN = re.compile(r'(\d+)-([^0-9\n]+)')
+LOCALIDAD_PATTERN = re.compile(r'(\d{4})-([^0-9\n]+)')
+# Pattern: number DNI year NAME,ADDRESS, DOC-TYPE GENDER
+VOTER_PATTERN = re.compile(r'\d+\s+(\d{8})\s+(\d{4})\s+([^,]+),([^,]+),\s*([^\s]+)\s+([MF])')
+# Lines starting like a voter line; the ones VOTER_PATTERN rejects are reported
+VOTER_PREFIX_PATTERN = re.compile(r'\d+\s+\d{8}')
+HEADER_MARKERS = ('CLASEAPELLIDO', 'DOCUMENTO GEN')
+
+# One dict per departamento/localidad, shared by all the voters in it
+_locations = {}
+
+def shared_location(codigo, nombre):
+    """Return the shared {"codigo", "nombre"} dict for a location"""
+    key = (codigo, nombre)
+    location = _locations.get(key)
+    if location is None:
+        location = _locations[key] = {"codigo": codigo, "nombre": nombre}
+    return location
 
 def extract_location_info(text):
     """Extract departamento and localidad from header"""
-    dept_match = re.search(r'(\d+)-([^0-9\n]+)', text)
-    loc_match = re.search(r'(\d{4})-([^0-9\n]+)', text)
+    dept_match = DEPARTAMENTO_PATTERN.search(text)
+    loc_match = LOCALIDAD_PATTERN.search(text)
     
     return {
-        "departamento": {
-            "codigo": dept_match.group(1) if dept_match else None,
-            "nombre": dept_match.group(2).strip() if dept_match else None
-        },
-        "localidad": {
-            "codigo": loc_match.group(1) if loc_match else None,
-            "nombre": loc_match.group(2).strip() if loc_match else None
-        }
+        "departamento": shared_location(
+            dept_match.group(1) if dept_match else None,
+            dept_match.group(2).strip() if dept_match else None
+        ),
+        "localidad": shared_location(
+            loc_match.group(1) if loc_match else None,
+            loc_match.group(2).strip() if loc_match else None
+        )
     }
 
 def parse_address(address):
@@ -25,9 +48,7 @@ def parse_address(address):
 
 def parse_voter_line(line, location_info):
     """Parse a single line from the voter registry"""
-    # Pattern: number DNI year NAME,ADDRESS, DOC-TYPE GENDER
-    pattern = r'^\d+\s+(\d{8})\s+(\d{4})\s+([^,]+),([^,]+),\s*([^\s]+)\s+([MF])'
-    match = re.match(pattern, line.strip())
+    match = VOTER_PATTERN.match(line.strip())
     if match:
         return {
             "departamento": location_info["departamento"],
@@ -41,35 +62,74 @@ def parse_voter_line(line, location_info):
         }
     return None
 
+def extract_page_text(pdf_path):
+    """Extract the text of the first page of a PDF"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return pdf.pages[0].extract_text()
+
+def count_pages(pdf_path):
+    """Number of pages of a PDF"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+def iter_page_texts(pdf_path, first_page=1, last_page=None):
+    """Yield (page number, text, extract seconds, error) for pages of a multi-page PDF"""
+    with pdfplumber.open(pdf_path) as pdf:
+        last_page = last_page or len(pdf.pages)
+        for number in range(first_page, last_page + 1):
+            page = pdf.pages[number - 1]
+            started = time.perf_counter()
+            try:
+                text, error = page.extract_text(), None
+            except Exception as e:
+                text, error = None, str(e)
+            # Drop the parsed page objects so long documents don't pile up in memory
+            page.close()
+            yield number, text, time.perf_counter() - started, error
+
+def parse_page_text(text):
+    """Parse the voters of a page, returning them with the voter lines that did not match"""
+    # Extract location information
+    location_info = extract_location_info(text)
+    departamento = location_info["departamento"]
+    localidad = location_info["localidad"]
+    
+    # The actual data starts on the line after the first header line
+    start = 0
+    headers = [pos for pos in (text.find(marker) for marker in HEADER_MARKERS) if pos != -1]
+    if headers:
+        newline = text.find('\n', min(headers))
+        start = newline + 1 if newline != -1 else len(text)
+    
+    # Process all voter lines with a single regex match per line
+    voters = []
+    unmatched = []
+    match_voter = VOTER_PATTERN.match
+    match_prefix = VOTER_PREFIX_PATTERN.match
+    for line in text[start:].split('\n'):
+        match = match_voter(line)
+        if match is not None:
+            dni, birth_year, name, address, doc_type, gender = match.groups()
+            voters.append({
+                "departamento": departamento,
+                "localidad": localidad,
+                "dni": dni,
+                "birth_year": int(birth_year),
+                "name": name.strip(),
+                "address": address.strip(),
+                "doc_type": doc_type.strip(),
+                "gender": gender
+            })
+        elif match_prefix(line):
+            unmatched.append(line)
+    
+    return voters, unmatched
+
 def get_all_voters(pdf_path):
     """Extract all voters and location info from the PDF"""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            page = pdf.pages[0]
-            text = page.extract_text()
-            
-            # Extract location information
-            location_info = extract_location_info(text)
-            
-            # Split into lines
-            lines = text.split('\n')
-            
-            # Find where the actual data starts (after headers)
-            start_idx = 0
-            for i, line in enumerate(lines):
-                if 'CLASEAPELLIDO' in line or 'DOCUMENTO GEN' in line:
-                    start_idx = i + 1
-                    break
-            
-            # Process all voter lines
-            voters = []
-            for line in lines[start_idx:]:
-                if re.match(r'^\d+\s+\d{8}', line):
-                    voter_data = parse_voter_line(line, location_info)
-                    if voter_data:
-                        voters.append(voter_data)
-            
-            return voters
+        voters, _ = parse_page_text(extract_page_text(pdf_path))
+        return voters
 
     except Exception as e:
         print(f"Error processing PDF {pdf_path}: {e}")
@@ -81,6 +141,25 @@ def save_to_json(data, output_path):
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+def process_page(pdf_file, telemetry):
+    """Extract and parse one page, recording its timings"""
+    extract_seconds = parse_seconds = 0.0
+    try:
+        started = time.perf_counter()
+        text = extract_page_text(pdf_file)
+        extract_seconds = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        voters, unmatched = parse_page_text(text)
+        parse_seconds = time.perf_counter() - started
+    except Exception as e:
+        print(f"\nError processing PDF {pdf_file}: {e}")
+        telemetry.record_page(pdf_file.name, extract_seconds, parse_seconds, 0, [], error=str(e))
+        return None
+    
+    telemetry.record_page(pdf_file.name, extract_seconds, parse_seconds, len(voters), unmatched)
+    return voters
+
 def process_all_pages(split_pages_dir, output_dir):
     """Process all page_x.pdf files in the directory"""
     # Get all PDF files sorted numerically
@@ -89,19 +168,18 @@ def process_all_pages(split_pages_dir, output_dir):
         key=lambda x: int(x.stem.split('_')[1])
     )
     
+    telemetry = RunTelemetry(len(pdf_files))
     total_voters = []
     
     for pdf_file in pdf_files:
-        print(f"Processing {pdf_file.name}...")
-        voters = get_all_voters(pdf_file)
+        voters = process_page(pdf_file, telemetry)
         if voters:
             total_voters.extend(voters)
             # Save individual page results
             page_output = output_dir / f"{pdf_file.stem}.json"
             save_to_json(voters, page_output)
-            print(f"Extracted {len(voters)} voters from {pdf_file.name}")
-        else:
-            print(f"Failed to extract data from {pdf_file.name}")
+        elif voters is not None:
+            print(f"\nFailed to extract data from {pdf_file.name}")
     
     # Save combined results
     if total_voters:
@@ -110,6 +188,15 @@ def process_all_pages(split_pages_dir, output_dir):
         print(f"\nTotal voters extracted: {len(total_voters)}")
         print(f"Combined data saved to {combined_output}")
     
+    # Save run report
+    report_output = output_dir / "run_report.json"
+    telemetry.save_report(report_output)
+    report = telemetry.report()
+    print(f"Pages per second: {report['pages_per_second']}, "
+          f"unmatched lines: {report['unmatched_lines']}, "
+          f"outlier pages: {len(report['outliers'])}")
+    print(f"Run report saved to {report_output}")
+    
     return len(total_voters)
 
 def main():
@@ -15,26 +15,31 @@ def split_pdf(input_path, output_folder):
     
     # Extract each page
     for page_num in range(total_pages):
-        # Create PDF writer object
-        writer = PdfWriter()
-        
-        # Add the current page
-        writer.add_page(reader.pages[page_num])
-        
-        # Generate output filename
-        output_filename = os.path.join(
-            output_folder,
-            f'page_{page_num + 1}.pdf'
-        )
-        
-        # Write the page to a file
-        with open(output_filename, 'wb') as output_file:
-            writer.write(output_file)
-            
+        output_filename = write_page(reader, page_num, output_folder)
         print(f'Created: {output_filename}')
     
     print(f'Successfully split {total_pages} pages')
 
+def write_page(reader, page_num, output_folder):
+    """Write one page (0-based) of an open PDF as page_<n>.pdf"""
+    # Create PDF writer object
+    writer = PdfWriter()
+    
+    # Add the current page
+    writer.add_page(reader.pages[page_num])
+    
+    # Generate output filename
+    output_filename = os.path.join(
+        output_folder,
+        f'page_{page_num + 1}.pdf'
+    )
+    
+    # Write the page to a file
+    with open(output_filename, 'wb') as output_file:
+        writer.write(output_file)
+    
+    return output_filename
+
 if __name__ == "__main__":
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Split a PDF file into individual pages')
@@ -0,0 +1,155 @@
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pandas as pd
+from PyPDF2 import PdfReader
+from pdf_splitter import write_page
+from pdf_info_extractor import count_pages, iter_page_texts, parse_page_text, save_to_json
+from extraction_telemetry import RunTelemetry
+from analyze_voters import (calculate_age, create_age_groups, plot_age_distribution,
+                            plot_gender_distribution, save_stats_to_csv)
+from voter_stream import write_json_array
+from shards import build_shards
+from limits import process_context
+
+# Pages per extraction task
+BATCH_PAGES = 20
+# Extraction tasks in flight per worker; bounds memory if parsing falls behind
+BATCHES_AHEAD = 2
+
+
+class Aggregates:
+    """Gender and age-group counts per localidad, updated one voter at a time"""
+
+    def __init__(self):
+        self.gender = Counter()
+        self.age = Counter()
+
+    def add(self, voter):
+        localidad = f"{voter['localidad']['codigo']}-{voter['localidad']['nombre']}"
+        self.gender[(localidad, voter['gender'])] += 1
+        self.age[(localidad, create_age_groups(calculate_age(voter['birth_year'])))] += 1
+
+    def gender_stats(self):
+        """Same table as analyze_voters.generate_gender_stats"""
+        stats = counts_table(self.gender).reindex(columns=['F', 'M'], fill_value=0)
+        stats['total'] = stats['F'] + stats['M']
+        stats['F_pct'] = (stats['F'] / stats['total'] * 100).round(1)
+        stats['M_pct'] = (stats['M'] / stats['total'] * 100).round(1)
+        return stats
+
+    def age_stats(self):
+        """Same tables as analyze_voters.generate_age_stats"""
+        age_stats = counts_table(self.age)
+        age_stats = age_stats[sorted(age_stats.columns)]
+        totals = age_stats.sum(axis=1)
+        age_pcts = (age_stats.div(totals, axis=0) * 100).round(1)
+        return age_stats, age_pcts
+
+
+def counts_table(counter):
+    """Turn a Counter keyed by (localidad, value) into a localidad x value table"""
+    table = pd.Series(counter, dtype=int).unstack(fill_value=0)
+    table.index.name = 'localidad'
+    return table
+
+
+def extract_batch(pdf_path, first_page, last_page, split_dir):
+    """Extract the texts of a range of pages; runs in a worker process"""
+    if split_dir is not None:
+        reader = PdfReader(str(pdf_path))
+        for page_num in range(first_page - 1, last_page):
+            write_page(reader, page_num, split_dir)
+    return list(iter_page_texts(pdf_path, first_page, last_page))
+
+
+def extract_stage(pdf_path, total_pages, split_dir, workers):
+    """Yield (number, text, seconds, error) in page order, extracting in worker processes.
+
+    pdfminer is pure Python and holds the GIL, so extraction only overlaps
+    parsing when it runs in other processes.
+    """
+    if split_dir is not None:
+        split_dir.mkdir(parents=True, exist_ok=True)
+    batches = ((first_page, min(first_page + BATCH_PAGES - 1, total_pages))
+               for first_page in range(1, total_pages + 1, BATCH_PAGES))
+    with ProcessPoolExecutor(workers, mp_context=process_context()) as executor:
+        pending = deque()
+        try:
+            for batch in batches:
+                pending.append(executor.submit(extract_batch, pdf_path, *batch, split_dir))
+                if len(pending) < workers * BATCHES_AHEAD:
+                    continue
+                yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def parse_stage(pages, telemetry, page_json_dir):
+    """Parse extracted page texts and yield their voters"""
+    for number, text, extract_seconds, error in pages:
+        name = f"page_{number}"
+        if error:
+            print(f"\nError processing page {number}: {error}")
+            telemetry.record_page(name, extract_seconds, 0.0, 0, [], error=error)
+            continue
+
+        started = time.perf_counter()
+        voters, unmatched = parse_page_text(text)
+        telemetry.record_page(name, extract_seconds, time.perf_counter() - started, len(voters), unmatched)
+        if page_json_dir is not None:
+            save_to_json(voters, page_json_dir / f"{name}.json")
+        yield from voters
+
+
+def build(pdf_path, data_dir, analysis_dir, padron, split_dir=None, page_json_dir=None,
+          shards=True, plots=False, workers=None):
+    """Go from the padrón PDF to the voters store, shards and statistics in one pass.
+
+    Pages are parsed and aggregated while worker processes extract the
+    following ones. The store has to be sorted by DNI, so the voters are
+    kept in memory and the store and shards are written once parsing ends.
+    """
+    pdf_path = Path(pdf_path)
+    total_pages = count_pages(pdf_path)
+    telemetry = RunTelemetry(total_pages)
+    workers = workers or os.cpu_count() or 1
+
+    aggregates = Aggregates()
+    voters = []
+    pages = extract_stage(pdf_path, total_pages, split_dir, workers)
+    for voter in parse_stage(pages, telemetry, page_json_dir):
+        aggregates.add(voter)
+        voters.append(voter)
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    telemetry.save_report(data_dir / "run_report.json")
+    if not voters:
+        print("\nNo data was extracted")
+        return 0
+
+    voters.sort(key=lambda x: x['dni'])
+    store_path = data_dir / "all_voters.json"
+    write_json_array(voters, store_path)
+    print(f"\nTotal voters extracted: {len(voters)}")
+    print(f"Combined data saved to {store_path}")
+
+    if shards:
+        entries = build_shards(voters, data_dir / "shards", padron, source=store_path)
+        print(f"Wrote {len(entries)} shards to {data_dir / 'shards'}")
+
+    analysis_dir.mkdir(parents=True, exist_ok=True)
+    gender_stats = aggregates.gender_stats()
+    age_stats, age_pcts = aggregates.age_stats()
+    save_stats_to_csv(gender_stats, age_stats, age_pcts, analysis_dir)
+    if plots:
+        plot_gender_distribution(gender_stats, analysis_dir)
+        plot_age_distribution(age_stats, age_pcts, analysis_dir)
+    print(f"Statistics saved to {analysis_dir}")
+
+    return len(voters)
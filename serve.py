@@ -0,0 +1,22 @@
+import argparse
+from app import app
+
+def serve(host, port, threads):
+    """Serve the app with waitress and a fixed number of request threads"""
+    try:
+        from waitress import serve as serve_waitress
+    except ImportError:
+        raise SystemExit('waitress is not installed; run pip install -r requirements.txt')
+    print(f'Serving on http://{host}:{port} with {threads} threads')
+    serve_waitress(app, host=host, port=port, threads=threads)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve the voter search app without the debug server')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--threads', type=int, default=16,
+                        help='Request threads; should exceed the search plus export limits (default: 16)')
+
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.threads)
@@ -0,0 +1,241 @@
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+from search_voters import load_voters, create_dataframe
+from households import HouseholdIndex
+from fuzzy_names import NameIndex
+
+MANIFEST_NAME = "manifest.json"
+
+# Same groups as analyze_voters.create_age_groups
+AGE_GROUP_EDGES = [-float('inf'), 26, 36, 46, 56, 66, 76, float('inf')]
+AGE_GROUP_LABELS = ['16-25', '26-35', '36-45', '46-55', '56-65', '66-75', '76+']
+
+
+def add_age_groups(df):
+    """Add a categorical age_group column so facet counts don't recompute ages"""
+    ages = datetime.now().year - df['birth_year']
+    df['age_group'] = pd.cut(ages, AGE_GROUP_EDGES, right=False, labels=AGE_GROUP_LABELS)
+    return df
+
+
+def shard_file_name(padron, voter):
+    """File name of the shard a voter belongs to"""
+    return f"{padron}_{voter['departamento']['codigo']}_{voter['localidad']['codigo']}.json"
+
+
+def source_version(path):
+    """Identify the merged voters file shards were built from by its size and modification time"""
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def build_shards(voters, shard_dir, padron, source=None):
+    """Split voters into one file per departamento/localidad and update the manifest.
+
+    Shards of other padrones already in the manifest are kept, so several
+    padrones (departamentos, election years) can live in the same directory.
+    `source` is the merged voters file; the manifest records its version so
+    the shards are rebuilt when a new edition replaces it.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    groups = {}
+    for voter in voters:
+        groups.setdefault(shard_file_name(padron, voter), []).append(voter)
+
+    entries = []
+    for file_name, shard_voters in sorted(groups.items()):
+        shard_voters.sort(key=lambda x: x['dni'])
+        with open(shard_dir / file_name, "w", encoding="utf-8") as f:
+            json.dump(shard_voters, f, ensure_ascii=False)
+        entries.append(shard_entry(padron, file_name, shard_voters[0], len(shard_voters)))
+
+    old_files = {e["file"] for e in load_manifest(shard_dir)["shards"] if e["padron"] == padron}
+    save_manifest(shard_dir, entries, padron, source)
+    # Localidades missing from the new edition; removed once the manifest no longer lists them
+    for file_name in old_files - set(groups):
+        (shard_dir / file_name).unlink(missing_ok=True)
+    return entries
+
+
+def shard_entry(padron, file_name, voter, count):
+    return {
+        "padron": padron,
+        "file": file_name,
+        "departamento": voter["departamento"],
+        "localidad": voter["localidad"],
+        "voters": count,
+    }
+
+
+def load_manifest(shard_dir):
+    manifest_path = shard_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {"shards": [], "sources": {}}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest.setdefault("sources", {})
+    return manifest
+
+
+def save_manifest(shard_dir, entries, padron, source=None):
+    """Replace the manifest entries of one padrón with new ones"""
+    manifest = load_manifest(shard_dir)
+    kept = [e for e in manifest["shards"] if e["padron"] != padron]
+    sources = {name: s for name, s in manifest["sources"].items() if name != padron}
+    if source is not None:
+        sources[padron] = {"path": str(source.resolve()), "version": source_version(source)}
+    manifest = {"shards": kept + list(entries), "sources": sources}
+    with open(shard_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def refresh_shards(shard_dir, default_source, default_padron="padron"):
+    """Rebuild the shards of every padrón whose merged voters file changed since they were built.
+
+    `default_source` is used for `default_padron` when the manifest doesn't
+    say where its shards came from (no shards yet, or built by an older
+    version). Returns the padrones that were rebuilt.
+    """
+    manifest = load_manifest(shard_dir)
+    sources = dict(manifest["sources"])
+    padrones = {e["padron"] for e in manifest["shards"]}
+    if default_padron not in sources and (not padrones or default_padron in padrones):
+        sources[default_padron] = {"path": str(default_source), "version": None}
+
+    rebuilt = []
+    for padron, source in sorted(sources.items()):
+        path = Path(source["path"])
+        if path.exists() and source["version"] != source_version(path):
+            if source["version"] is None:
+                print(f"Building the {padron} shards from {path}")
+            else:
+                print(f"{path} changed since the {padron} shards were built; rebuilding them")
+            build_shards(load_voters(path), shard_dir, padron, source=path)
+            rebuilt.append(padron)
+    return rebuilt
+
+
+class Shard:
+    """The voters of one localidad of one padrón, with their indexes"""
+
+    def __init__(self, entry, df):
+        self.entry = entry
+        self.df = df
+        self.households = HouseholdIndex(df)
+        self._name_index = None
+        self._lock = threading.Lock()
+        # Indexes hold a few arrays per row; count them like one more copy of the data
+        self.memory_bytes = int(df.memory_usage(deep=True).sum()) * 2
+
+    def name_index(self):
+        """Return the fuzzy name index, building it on first use"""
+        with self._lock:
+            if self._name_index is None:
+                self._name_index = NameIndex(self.df['name'])
+        return self._name_index
+
+
+class ShardStore:
+    """Load shards when a query first needs them and evict cold ones over a memory budget"""
+
+    def __init__(self, shard_dir, memory_budget_bytes):
+        self.shard_dir = shard_dir
+        self.manifest_path = shard_dir / MANIFEST_NAME
+        self.memory_budget_bytes = memory_budget_bytes
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            self.entries = json.load(f)["shards"]
+        self.loaded = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # One lock per shard being loaded
+        self._loading = {}
+
+    def localities(self):
+        """Names of all localidades, known without loading any shard"""
+        return sorted({entry["localidad"]["nombre"] for entry in self.entries})
+
+    def padrones(self):
+        return sorted({entry["padron"] for entry in self.entries})
+
+    def select(self, localidad=None, padron=None):
+        """Manifest entries of the shards a query has to look at"""
+        return [
+            entry for entry in self.entries
+            if (not localidad or entry["localidad"]["nombre"] == localidad)
+            and (not padron or entry["padron"] == padron)
+        ]
+
+    def get(self, entry):
+        """Return the loaded shard for a manifest entry, loading it if needed"""
+        key = entry["file"]
+        with self._lock:
+            shard = self._touch(key)
+            if shard is not None:
+                return shard
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        # Load without the store lock so queries on loaded shards don't wait;
+        # queries for this same shard wait here and reuse the result
+        with loading:
+            with self._lock:
+                shard = self._touch(key)
+                if shard is not None:
+                    return shard
+
+            df = add_age_groups(create_dataframe(load_voters(self.shard_dir / key)))
+            shard = Shard(entry, df)
+            with self._lock:
+                self.loaded[key] = shard
+                self.loads += 1
+                self._evict(keep=key)
+                del self._loading[key]
+            return shard
+
+    def memory_bytes(self):
+        with self._lock:
+            return self._memory_bytes()
+
+    def _touch(self, key):
+        shard = self.loaded.get(key)
+        if shard is not None:
+            self.loaded.move_to_end(key)
+        return shard
+
+    def _memory_bytes(self):
+        return sum(shard.memory_bytes for shard in self.loaded.values())
+
+    def _evict(self, keep):
+        # Queries still holding an evicted shard keep it alive until they finish
+        while self._memory_bytes() > self.memory_budget_bytes and len(self.loaded) > 1:
+            key = next(iter(self.loaded))
+            if key == keep:
+                self.loaded.move_to_end(key)
+                continue
+            del self.loaded[key]
+            self.evictions += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split a merged voters file into per-localidad shards')
+    parser.add_argument('input_json', nargs='?', default='data/all_voters.json',
+                        help='Merged voters file (default: data/all_voters.json)')
+    parser.add_argument('--padron', default='padron',
+                        help='Name of the padrón, e.g. castellanos-2025 (default: padron)')
+    parser.add_argument('--output-dir', '-o', default='data/shards',
+                        help='Shard directory (default: data/shards)')
+
+    args = parser.parse_args()
+
+    voters = load_voters(Path(args.input_json))
+    entries = build_shards(voters, Path(args.output_dir), args.padron, source=Path(args.input_json))
+    print(f"Wrote {len(entries)} shards with {len(voters)} voters to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
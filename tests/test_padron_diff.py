@@ -0,0 +1,45 @@
+import json
+import pytest
+from padron_diff import diff_snapshots
+
+
+def voter(dni, localidad="RAFAELA", address="MITRE 10"):
+    return {
+        "dni": dni,
+        "name": "PEREZ ANA",
+        "departamento": {"codigo": "09", "nombre": "CASTELLANOS"},
+        "localidad": {"codigo": "0001", "nombre": localidad},
+        "address": address,
+    }
+
+
+def write(path, voters):
+    path.write_text(json.dumps(voters), encoding="utf-8")
+    return path
+
+
+def read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_duplicate_dnis_are_set_aside(tmp_path):
+    old = write(tmp_path / "old.json", [voter("1"), voter("1", address="BELGRANO 5"), voter("2")])
+    new = write(tmp_path / "new.json", [voter("1"), voter("3")])
+    summary = diff_snapshots(old, new, tmp_path / "changes")
+    assert summary["totals"] == {"added": 1, "removed": 1, "changed": 0}
+    assert summary["duplicates"] == {"old": 1, "new": 0}
+    duplicates = read(tmp_path / "changes" / "duplicates.json")
+    assert [(d["edition"], d["address"]) for d in duplicates] == [("old", "BELGRANO 5")]
+
+
+def test_failed_diff_keeps_previous_output(tmp_path):
+    output_dir = tmp_path / "changes"
+    old = write(tmp_path / "old.json", [voter("1"), voter("2")])
+    new = write(tmp_path / "new.json", [voter("2"), voter("3")])
+    diff_snapshots(old, new, output_dir)
+    before = {path.name: path.read_bytes() for path in output_dir.iterdir()}
+
+    unsorted = write(tmp_path / "unsorted.json", [voter("3"), voter("1")])
+    with pytest.raises(ValueError):
+        diff_snapshots(old, unsorted, output_dir)
+    assert {path.name: path.read_bytes() for path in output_dir.iterdir()} == before
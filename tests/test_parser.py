@@ -0,0 +1,24 @@
+import random
+from pathlib import Path
+from bench_parser import check_pages, load_pages, synthetic_page
+from pdf_info_extractor import parse_page_text
+
+FIXTURES = Path(__file__).parent / "fixtures" / "page_texts"
+
+
+def test_fixtures_match_golden_output_and_legacy_parser():
+    pages = load_pages(FIXTURES, synthetic_pages=0)
+    assert len(pages) == 5
+    assert check_pages(pages, update_golden=False) == 0
+
+
+def test_synthetic_pages_match_legacy_parser():
+    rng = random.Random(1)
+    pages = [(None, synthetic_page(rng, page_num)) for page_num in range(1, 51)]
+    assert check_pages(pages, update_golden=False) == 0
+
+
+def test_voters_share_location_objects():
+    first, _ = parse_page_text((FIXTURES / "page_000001.txt").read_text(encoding="utf-8"))
+    again, _ = parse_page_text((FIXTURES / "page_000001.txt").read_text(encoding="utf-8"))
+    assert first[0]["localidad"] is first[-1]["localidad"] is again[0]["localidad"]
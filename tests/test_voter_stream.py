@@ -0,0 +1,19 @@
+import json
+from voter_stream import iter_json_array, write_json_array
+
+
+def test_numbers_cut_at_chunk_boundaries(tmp_path):
+    items = [0, 1000, 0, 0, 3, 12345678, -7, 1.5, 1.5e10, -0.25e-3, True, None, "1000", {"dni": 10}]
+    path = tmp_path / "items.json"
+    for text in (json.dumps(items, separators=(",", ":")), json.dumps(items)):
+        path.write_text(text, encoding="utf-8")
+        for chunk_size in range(1, 12):
+            assert list(iter_json_array(path, chunk_size=chunk_size)) == items
+
+
+def test_round_trip_with_writer(tmp_path):
+    voters = [{"dni": f"{n:08d}", "name": "NUÑEZ ANA", "birth_year": 1900 + n % 100} for n in range(200)]
+    path = tmp_path / "voters.json"
+    assert write_json_array(voters, path) == len(voters)
+    assert path.read_text(encoding="utf-8") == json.dumps(voters, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(path, chunk_size=5)) == voters
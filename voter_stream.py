@@ -0,0 +1,91 @@
+import json
+
+WHITESPACE = " \t\r\n"
+# Characters that can follow an array item
+DELIMITERS = WHITESPACE + ",]"
+
+
+class JsonArrayWriter:
+    """Write items one at a time as a JSON array laid out like json.dump(..., indent=2)"""
+
+    def __init__(self, output_path):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(output_path, "w", encoding="utf-8")
+        self.file.write("[")
+        self.count = 0
+
+    def write(self, item):
+        self.file.write(",\n  " if self.count else "\n  ")
+        self.file.write(json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+        self.count += 1
+
+    def close(self):
+        self.file.write("\n]" if self.count else "]")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_json_array(items, output_path):
+    """Write an iterable of items to a JSON array file and return how many there were"""
+    with JsonArrayWriter(output_path) as writer:
+        for item in items:
+            writer.write(item)
+    return writer.count
+
+
+def iter_json_array(input_path, chunk_size=1 << 16):
+    """Yield the items of a JSON array file one at a time without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(input_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        started = False
+        while True:
+            # Find the next meaningful character, reading more of the file as needed
+            while True:
+                while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                if not buffer:
+                    raise ValueError(f"{input_path} ends before its JSON array is closed")
+
+            char = buffer[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError(f"{input_path} does not contain a JSON array")
+                started = True
+                pos += 1
+                continue
+            if char == "]":
+                return
+            if char == ",":
+                pos += 1
+                continue
+
+            # Decode one item, extending the buffer until it holds all of it.
+            # A number cut by the end of the buffer still decodes ("10" of
+            # "1000", "1." of "1.5"), so an item only counts once a delimiter
+            # or the end of the file follows it.
+            eof = False
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                    if eof or (end < len(buffer) and buffer[end] in DELIMITERS):
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                chunk = f.read(chunk_size)
+                if chunk:
+                    buffer, pos = buffer[pos:] + chunk, 0
+                else:
+                    eof = True
+            yield item
+            pos = end
@@ -0,0 +1,216 @@
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from pdf_info_extractor import count_pages, iter_page_texts, parse_page_text
+from voter_stream import write_json_array
+from shards import build_shards
+
+# A shared directory works as the queue. Batches of pages move between
+#   pending/  waiting for a worker
+#   leased/   claimed by a worker; the file's mtime is the worker's heartbeat
+#   done/     finished
+# and every page result is written to results/. All moves are renames, which
+# are atomic on the same filesystem, so two workers can never claim the same
+# batch at once. A claimed batch file carries its worker's lease token; when a
+# stalled batch is requeued and claimed again, the old worker sees another
+# token and stops.
+STATES = ("pending", "leased", "done")
+JOB_FILE = "job.json"
+
+
+def batch_name(first_page, last_page):
+    return f"batch_{first_page:06d}-{last_page:06d}.json"
+
+
+def write_atomically(data, output_path):
+    """Write JSON to a temporary file and rename it into place"""
+    # Workers on other machines can share our PID, so the name must be unique
+    # across the whole queue
+    tmp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def init_queue(queue_dir, pdf_path, batch_size, lease_seconds):
+    """Create the queue with one pending batch per `batch_size` pages"""
+    for state in STATES + ("results",):
+        (queue_dir / state).mkdir(parents=True, exist_ok=True)
+    total_pages = count_pages(pdf_path)
+    job = {
+        "pdf": str(Path(pdf_path).resolve()),
+        "total_pages": total_pages,
+        "batch_size": batch_size,
+        "lease_seconds": lease_seconds,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    for first_page in range(1, total_pages + 1, batch_size):
+        last_page = min(first_page + batch_size - 1, total_pages)
+        write_atomically({"first_page": first_page, "last_page": last_page},
+                         queue_dir / "pending" / batch_name(first_page, last_page))
+    write_atomically(job, queue_dir / JOB_FILE)
+    return job
+
+
+def queue_counts(queue_dir):
+    return {state: len(list((queue_dir / state).glob("batch_*.json"))) for state in STATES}
+
+
+def requeue_stalled(queue_dir, lease_seconds):
+    """Move leases whose worker stopped sending heartbeats back to pending"""
+    requeued = []
+    now = time.time()
+    for leased in (queue_dir / "leased").glob("batch_*.json"):
+        try:
+            if now - leased.stat().st_mtime <= lease_seconds:
+                continue
+            pending = queue_dir / "pending" / leased.name
+            os.rename(leased, pending)
+            requeued.append(leased.name)
+            # A rename keeps the stale mtime; refresh it so the next claim
+            # doesn't start out looking expired
+            os.utime(pending)
+        except FileNotFoundError:
+            # The worker finished it, or someone else requeued or claimed it, meanwhile
+            continue
+    return requeued
+
+
+def claim_batch(queue_dir, worker_id):
+    """Take a pending batch by renaming it into leased/; returns (path, batch) or None"""
+    for pending in sorted((queue_dir / "pending").glob("batch_*.json")):
+        leased = queue_dir / "leased" / pending.name
+        try:
+            os.rename(pending, leased)
+            # Fresh heartbeat before anything else, or requeue_stalled may
+            # take the batch back before our token is written
+            os.utime(leased)
+            batch = read_json(leased)
+        except FileNotFoundError:
+            # Another worker claimed it first
+            continue
+        # Stamp the lease with our token; rewriting the file also starts the heartbeat
+        batch["lease"] = f"{worker_id}-{uuid.uuid4().hex}"
+        write_atomically(batch, leased)
+        return leased, batch
+    return None
+
+
+def holds_lease(leased, batch):
+    """Whether the leased file still carries our token, i.e. nobody re-leased the batch"""
+    try:
+        return read_json(leased).get("lease") == batch["lease"]
+    except FileNotFoundError:
+        return False
+
+
+def process_batch(queue_dir, leased, batch, pdf_path):
+    """Extract the pages of a leased batch; returns False if the lease was lost"""
+    results_dir = queue_dir / "results"
+    for number, text, extract_seconds, error in iter_page_texts(pdf_path, batch["first_page"], batch["last_page"]):
+        result_path = results_dir / f"page_{number:06d}.json"
+        if not result_path.exists():
+            result = {"page": number, "voters": [], "unmatched_lines": [],
+                      "extract_seconds": round(extract_seconds, 4), "parse_seconds": 0.0, "error": error}
+            if not error:
+                started = time.perf_counter()
+                result["voters"], result["unmatched_lines"] = parse_page_text(text)
+                result["parse_seconds"] = round(time.perf_counter() - started, 4)
+            write_atomically(result, result_path)
+        # Heartbeat: keep the lease fresh, unless it was requeued or re-leased
+        if not holds_lease(leased, batch):
+            return False
+        try:
+            os.utime(leased)
+        except FileNotFoundError:
+            return False
+    if not holds_lease(leased, batch):
+        return False
+    try:
+        os.rename(leased, queue_dir / "done" / leased.name)
+    except FileNotFoundError:
+        # Requeued after we finished; the results are already written
+        return False
+    return True
+
+
+def run_worker(queue_dir, pdf_path=None, poll_seconds=5):
+    """Claim and process batches until the queue has no work left"""
+    job = read_json(queue_dir / JOB_FILE)
+    pdf_path = pdf_path or job["pdf"]
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    processed = 0
+    while True:
+        claimed = claim_batch(queue_dir, worker_id)
+        if claimed is None:
+            requeue_stalled(queue_dir, job["lease_seconds"])
+            counts = queue_counts(queue_dir)
+            if not counts["pending"] and not counts["leased"]:
+                break
+            time.sleep(poll_seconds)
+            continue
+        leased, batch = claimed
+        print(f"[{worker_id}] Processing {leased.stem}")
+        if process_batch(queue_dir, leased, batch, pdf_path):
+            processed += 1
+        else:
+            print(f"[{worker_id}] Lost the lease on {leased.stem}")
+    print(f"[{worker_id}] No work left, processed {processed} batches")
+    return processed
+
+
+def merge_results(queue_dir, data_dir, padron, shards=True):
+    """Combine the page results into the voters store, sorted by DNI"""
+    voters = []
+    failed_pages = []
+    unmatched_lines = 0
+    for result_path in sorted((queue_dir / "results").glob("page_*.json")):
+        result = read_json(result_path)
+        if result["error"]:
+            failed_pages.append(result["page"])
+        voters.extend(result["voters"])
+        unmatched_lines += len(result["unmatched_lines"])
+
+    voters.sort(key=lambda x: x['dni'])
+    store_path = data_dir / "all_voters.json"
+    write_json_array(voters, store_path)
+    print(f"\nTotal voters extracted: {len(voters)}")
+    print(f"Combined data saved to {store_path}")
+    if unmatched_lines:
+        print(f"Unmatched voter lines: {unmatched_lines}")
+    if failed_pages:
+        print(f"Failed pages: {', '.join(map(str, failed_pages))}")
+    if shards and voters:
+        entries = build_shards(voters, data_dir / "shards", padron, source=store_path)
+        print(f"Wrote {len(entries)} shards to {data_dir / 'shards'}")
+    return len(voters)
+
+
+def run_coordinator(queue_dir, data_dir, padron, poll_seconds=10, shards=True):
+    """Re-lease stalled batches until the queue drains, then merge the results"""
+    job = read_json(queue_dir / JOB_FILE)
+    total_batches = sum(queue_counts(queue_dir).values())
+    started = time.perf_counter()
+    while True:
+        for name in requeue_stalled(queue_dir, job["lease_seconds"]):
+            print(f"\nRequeued stalled {name}")
+        counts = queue_counts(queue_dir)
+        pages_done = len(list((queue_dir / "results").glob("page_*.json")))
+        rate = pages_done / (time.perf_counter() - started)
+        print(f"\r{counts['done']}/{total_batches} batches done, {counts['leased']} leased, "
+              f"{counts['pending']} pending, {pages_done}/{job['total_pages']} pages ({rate:.1f} pages/s)",
+              end="", flush=True)
+        if not counts["pending"] and not counts["leased"]:
+            break
+        time.sleep(poll_seconds)
+    print()
+    return merge_results(queue_dir, data_dir, padron, shards)